@@ -1,14 +1,23 @@
-import argparse
 import json
+import math
 import os
+import queue
 import random
+import signal
+import struct
 import sys
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+import zlib
+from array import array
+from itertools import accumulate, chain, compress, islice
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 import ctypes
 import threading
 
+if TYPE_CHECKING:  # pragma: no cover - annotations only; argparse is imported lazily
+    import argparse
+
 try:
     import winsound
 except ImportError:  # pragma: no cover - non-Windows
@@ -30,17 +39,302 @@ if sys.version_info.major == 3 and sys.version_info.minor > MAX_TESTED_MINOR:
         "the 'pynput' dependency installs successfully."
     )
 
-try:
-    from pynput import mouse, keyboard
-    from pynput.mouse import Controller as MouseController
-except ImportError as exc:  # pragma: no cover - env specific
-    raise SystemExit(
-        "Missing optional dependency 'pynput'. Install it with 'python -m pip install -r requirements.txt' "
-        "or 'python -m pip install pynput'."
-    ) from exc
+# pynput is imported on first use so --help and argument errors skip loading the input backends
+mouse: Any = None
+keyboard: Any = None
+MouseController: Any = None
+
+
+def _import_pynput() -> None:
+    global mouse, keyboard, MouseController
+    if mouse is not None:
+        return
+    try:
+        from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
+    except ImportError as exc:  # pragma: no cover - env specific
+        raise SystemExit(
+            "Missing optional dependency 'pynput'. Install it with 'python -m pip install -r requirements.txt' "
+            "or 'python -m pip install pynput'."
+        ) from exc
+    mouse = pynput_mouse
+    keyboard = pynput_keyboard
+    MouseController = pynput_mouse.Controller
+
+
+EVENT_MOVE = 0
+EVENT_CLICK = 1
+EVENT_KEY = 2
+
+# Order matches the virtual-key table used for Windows button polling
+BUTTON_NAMES = ('left', 'right', 'middle', 'x1', 'x2')
+_BUTTON_INDEX = {name: index for index, name in enumerate(BUTTON_NAMES)}
+
+_PATTERN_MAGIC = b'MMPT'
+_PATTERN_VERSION = 2
+# magic, version, event count, typecode of the coordinate delta columns
+_PATTERN_HEADER = struct.Struct('<4sBIc')
+# In-memory (column attribute, array typecode) pairs
+_PATTERN_COLUMNS = (
+    ('x', 'i'),
+    ('y', 'i'),
+    # Seconds since recording start (perf_counter based); float32 still resolves < 1 ms after an hour
+    ('t', 'f'),
+    ('kind', 'B'),
+    ('button', 'B'),
+    ('pressed', 'B'),
+)
+
+
+_TREMOR_OFFSETS = (-2, -1, 0, 1, 2)
+_MAX_SPIN_S = 0.001
+# Replay steps sleep in batches of at least this long (or one timer tick), well under a 60 Hz frame
+_MIN_SLEEP_BATCH_S = 0.008
+_MODIFIER_KEY_NAMES = ('shift', 'ctrl', 'alt', 'cmd')
+# No f10: it is the stop hotkey, and the script's own listener would see the injected press
+_SPECIAL_KEY_NAMES = (
+    'enter', 'backspace', 'space', 'tab', 'esc', 'up', 'down', 'left', 'right', 'delete',
+    'page_up', 'page_down', 'home', 'end',
+    'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f11', 'f12',
+)
+
+
+def _measure_sleep_granularity(samples: int = 3) -> float:
+    # Shortest real duration of a 1 ms sleep: ~1 ms with a raised timer, ~15.6 ms on stock Windows
+    best = float('inf')
+    for _ in range(samples):
+        start = time.perf_counter()
+        time.sleep(0.001)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _precise_sleep(duration: float, granularity: float) -> None:
+    # Coarse sleep, then spin on perf_counter through the sleep's expected overrun (how far a 1 ms
+    # sleep ran over), capped at 1 ms; a coarse timer (stock 15.6 ms Windows tick) gets no spin
+    spin = granularity - 0.001
+    if spin > _MAX_SPIN_S:
+        time.sleep(duration)
+        return
+    deadline = time.perf_counter() + duration
+    if duration > spin:
+        time.sleep(duration - spin)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _wait_event(event: threading.Event, timeout: float) -> bool:
+    # Event.wait in slices of at most a second; before Python 3.14 a lock wait on Windows can't be
+    # interrupted, so one long wait would hold off the SIGINT handler until it returned
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return event.is_set()
+        if event.wait(min(remaining, 1.0)):
+            return True
+
+
+def _pack_columns(columns: Tuple[array, ...]) -> bytes:
+    chunks = []
+    for column in columns:
+        if sys.byteorder == 'big':
+            column = array(column.typecode, column)
+            column.byteswap()
+        chunks.append(column.tobytes())
+    return b''.join(chunks)
+
+
+def _unpack_columns(payload: memoryview, typecodes: Tuple[str, ...], count: int) -> Tuple[List[array], int]:
+    columns = []
+    offset = 0
+    for typecode in typecodes:
+        column = array(typecode)
+        size = column.itemsize * count
+        column.frombytes(payload[offset:offset + size])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column)
+        offset += size
+    return columns, offset
+
+
+def _key_name(key: Any) -> str:
+    # Printable keys by character, special keys by their Key member name ('enter', 'shift', ...)
+    char = getattr(key, 'char', None)
+    return char if char else str(key).rpartition('.')[2]
+
+
+@lru_cache(maxsize=64)
+def _ease_table(steps: int) -> Tuple[float, ...]:
+    # Smoothstep progress per step; most segments share a handful of step counts (often the minimum 5)
+    return tuple(p * p * (3.0 - 2.0 * p) for p in (step / steps for step in range(1, steps + 1)))
+
+
+def _eased_path(
+    start_x: int,
+    start_y: int,
+    target_x: int,
+    target_y: int,
+    tremor: List[int],
+    bounds: Tuple[int, int, int, int]
+) -> List[Tuple[int, int]]:
+    # Deterministic ease-in-out (smoothstep) trajectory; tremor holds all x offsets, then all y offsets.
+    # Points are clamped after tremor so an edge target can't be nudged off-screen, where the OS
+    # would pin the cursor and the listener would report a position replay never set
+    steps = len(tremor) // 2
+    dx = target_x - start_x
+    dy = target_y - start_y
+    left, top, right, bottom = bounds
+    return [
+        (
+            max(left, min(int(start_x + dx * e) + tx, right)),
+            max(top, min(int(start_y + dy * e) + ty, bottom))
+        )
+        for e, tx, ty in zip(_ease_table(steps), tremor, islice(tremor, steps, None))
+    ]
+
+
+class _RecordedPattern:
+    """Recorded events stored as parallel typed arrays rather than one dict per event.
+
+    Column typecodes are listed in ``_PATTERN_COLUMNS``. Key events carry zero
+    coordinates; their key names live in the sparse ``keys`` mapping, indexed
+    by event position.
+    """
+
+    def __init__(self):
+        for name, typecode in _PATTERN_COLUMNS:
+            setattr(self, name, array(typecode))
+        self.keys: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def _append(self, kind: int, x: int, y: int, timestamp: float, button: int = 0, pressed: bool = False) -> None:
+        self.x.append(x)
+        self.y.append(y)
+        self.t.append(timestamp)
+        self.kind.append(kind)
+        self.button.append(button)
+        self.pressed.append(pressed)
+
+    def append_move(self, x: int, y: int, timestamp: float) -> None:
+        self._append(EVENT_MOVE, x, y, timestamp)
+
+    def replace_last_move(self, x: int, y: int, timestamp: float) -> None:
+        self.x[-1] = x
+        self.y[-1] = y
+        self.t[-1] = timestamp
+
+    def append_click(self, x: int, y: int, button: int, pressed: bool, timestamp: float) -> None:
+        self._append(EVENT_CLICK, x, y, timestamp, button, pressed)
+
+    def append_key(self, key: str, pressed: bool, timestamp: float) -> None:
+        self.keys[len(self.t)] = key
+        self._append(EVENT_KEY, 0, 0, timestamp, 0, pressed)
+
+    @classmethod
+    def from_events(cls, events: List[Dict[str, Any]]) -> "_RecordedPattern":
+        pattern = cls()
+        for event in events:
+            kind = event.get('type')
+            if kind == 'move':
+                pattern.append_move(int(event['x']), int(event['y']), float(event['timestamp']))
+            elif kind == 'click':
+                name = str(event.get('button', '')).rpartition('.')[2]
+                pattern.append_click(
+                    int(event['x']),
+                    int(event['y']),
+                    _BUTTON_INDEX.get(name, 0),
+                    bool(event['pressed']),
+                    float(event['timestamp'])
+                )
+            elif kind == 'key':
+                pattern.append_key(str(event['key']), bool(event['pressed']), float(event['timestamp']))
+        return pattern
+
+    def clamp(self, left: int, top: int, right: int, bottom: int) -> None:
+        self.x = array('i', [min(max(x, left), right) for x in self.x])
+        self.y = array('i', [min(max(y, top), bottom) for y in self.y])
+
+    def to_bytes(self) -> bytes:
+        # Coordinates and timestamps are delta-encoded: paths move in small steps and time only grows
+        dx = [b - a for a, b in zip(chain((0,), self.x), self.x)]
+        dy = [b - a for a, b in zip(chain((0,), self.y), self.y)]
+        coord_code = 'h' if all(-32768 <= d <= 32767 for d in chain(dx, dy)) else 'i'
+        dt = [b - a for a, b in zip(chain((0.0,), self.t), self.t)]
+        payload = _pack_columns((
+            array(coord_code, dx),
+            array(coord_code, dy),
+            array('f', dt),
+            self.kind,
+            self.button,
+            self.pressed,
+        ))
+        key_names = [self.keys[i] for i in sorted(self.keys)]
+        payload += json.dumps(key_names).encode('utf-8')
+        header = _PATTERN_HEADER.pack(_PATTERN_MAGIC, _PATTERN_VERSION, len(self), coord_code.encode('ascii'))
+        return header + zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "_RecordedPattern":
+        data = memoryview(data)
+        magic, version, count, coord_code = _PATTERN_HEADER.unpack_from(data)
+        if magic != _PATTERN_MAGIC or version != _PATTERN_VERSION:
+            raise ValueError("unrecognized pattern file format")
+        payload = memoryview(zlib.decompress(data[_PATTERN_HEADER.size:]))
+        coord_code = coord_code.decode('ascii')
+        columns, offset = _unpack_columns(payload, (coord_code, coord_code, 'f', 'B', 'B', 'B'), count)
+        dx, dy, dt, kind, button, pressed = columns
+        pattern = cls()
+        pattern.x = array('i', accumulate(dx))
+        pattern.y = array('i', accumulate(dy))
+        pattern.t = array('f', accumulate(dt))
+        pattern.kind, pattern.button, pattern.pressed = kind, button, pressed
+        key_names = json.loads(str(payload[offset:], 'utf-8'))
+        key_indices = [i for i, kind in enumerate(pattern.kind) if kind == EVENT_KEY]
+        pattern.keys = dict(zip(key_indices, key_names))
+        return pattern
+
+    def to_events(self) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        for i, kind in enumerate(self.kind):
+            if kind == EVENT_MOVE:
+                events.append({'type': 'move', 'x': self.x[i], 'y': self.y[i], 'timestamp': self.t[i]})
+            elif kind == EVENT_CLICK:
+                events.append({
+                    'type': 'click',
+                    'x': self.x[i],
+                    'y': self.y[i],
+                    'button': f'Button.{BUTTON_NAMES[self.button[i]]}',
+                    'pressed': bool(self.pressed[i]),
+                    'timestamp': self.t[i]
+                })
+            else:
+                events.append({
+                    'type': 'key',
+                    'key': self.keys[i],
+                    'pressed': bool(self.pressed[i]),
+                    'timestamp': self.t[i]
+                })
+        return events
 
 
 class MouseMover:
+    # Every instance attribute is declared here; assigning anything else raises AttributeError
+    __slots__ = (
+        'interval_mins', '_base_wait_s', 'duration_mins', 'pattern_file', 'legacy_pattern_file',
+        'pattern', 'track_keys', 'recording', '_stop_event', '_graceful_stop', 'mouse_controller', '_buttons',
+        '_keyboard_listener', '_kb', '_modifier_keys', '_special_keys', 'user_moved_mouse',
+        'currently_replaying', '_grace_deadline', 'grace_period_active', 'grace_period_duration',
+        '_recent_positions', '_recent_index', 'activity_window_seconds', 'activity_postpone_seconds',
+        'activity_movement_threshold', '_activity_listener', '_activity_anchor', '_activity_event',
+        '_last_activity_reason', 'is_windows', '_user32',
+        'screen_bounds', '_set_cursor', '_timer_period_raised', '_timer_resolution', '_vk_codes',
+        '_vk_list', '_GetAsyncKeyState', 'alarm_interval_mins', '_beep', '_alarm_stop_event',
+        'alarm_thread', 'held_modifiers', 'pattern_center_x', 'pattern_center_y', 'pattern_bounds',
+    )
+
     def __init__(
         self,
         interval_mins: Optional[float] = None,
@@ -48,24 +342,50 @@ class MouseMover:
         alarm_interval_mins: float = 0.0,
         track_keys: bool = False
     ):
+        _import_pynput()
         self.interval_mins = interval_mins
+        self._base_wait_s = (interval_mins or 0.0) * 60.0
         self.duration_mins = duration_mins
-        self.pattern_file = "mouse_pattern.json"
-        self.mouse_positions: List[Dict[str, Any]] = []
+        self.pattern_file = "mouse_pattern.bin"
+        self.legacy_pattern_file = "mouse_pattern.json"
+        self.pattern = _RecordedPattern()
         self.track_keys = track_keys
         self.recording = False
-        self.running = True
+        self._stop_event = threading.Event()
+        # False while blocking calls (input(), recording) run that can't watch the stop event
+        self._graceful_stop = False
         self.mouse_controller = MouseController()
+        # pynput Buttons indexed like BUTTON_NAMES; x1/x2 only exist on some platforms
+        self._buttons = tuple(getattr(mouse.Button, name, None) for name in BUTTON_NAMES)
+        self._keyboard_listener: Optional[Any] = None
+        # Key replay lookups, built once; special keys are matched by their 'Key.'-prefixed name
+        self._kb = keyboard.Controller()
+        self._modifier_keys = {name: getattr(keyboard.Key, name) for name in _MODIFIER_KEY_NAMES}
+        self._special_keys = {f'Key.{name}': getattr(keyboard.Key, name) for name in _SPECIAL_KEY_NAMES}
         self.user_moved_mouse = False
         self.currently_replaying = False
-        self.grace_period_start: Optional[float] = None
+        self._grace_deadline = 0.0
         self.grace_period_active = False
         self.grace_period_duration = 0.5
+        self._recent_positions: List[Optional[Tuple[int, int]]] = [None] * 32
+        self._recent_index = 0
         self.activity_window_seconds = 5.0
         self.activity_postpone_seconds = 5.0
         self.activity_movement_threshold = 12
-        self.activity_poll_interval = 0.1
+        # One mouse listener for the whole session feeds both the quiet-period wait and replay override
+        self._activity_listener: Optional[Any] = None
+        self._activity_anchor: Optional[Tuple[int, int]] = None
+        self._activity_event = threading.Event()
+        self._last_activity_reason = "mouse activity"
         self.is_windows = sys.platform.startswith('win')
+        # Private user32 handle: argtypes set here don't leak into the shared ctypes.windll loader
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True) if self.is_windows else None
+        self.screen_bounds = self._query_screen_bounds()
+        self._set_cursor = self._bind_cursor_setter()
+        self._timer_period_raised = False
+        if self.is_windows:
+            self._raise_timer_resolution()
+        self._timer_resolution = _measure_sleep_granularity()
         self._vk_codes = {
             'left': 0x01,
             'right': 0x02,
@@ -73,7 +393,15 @@ class MouseMover:
             'x1': 0x05,
             'x2': 0x06,
         }
+        # Bit i of a button mask is BUTTON_NAMES[i]; _vk_codes is declared in the same order
+        self._vk_list = tuple(self._vk_codes.items())
+        self._GetAsyncKeyState = None
+        if self._user32 is not None:
+            self._GetAsyncKeyState = self._user32.GetAsyncKeyState
+            self._GetAsyncKeyState.argtypes = [ctypes.c_int]
+            self._GetAsyncKeyState.restype = ctypes.c_short
         self.alarm_interval_mins = max(0.0, alarm_interval_mins or 0.0)
+        self._beep: Callable[[], None] = self._resolve_beep
         self._alarm_stop_event = threading.Event()
         self.alarm_thread: Optional[threading.Thread] = None
         if self.alarm_interval_mins > 0:
@@ -85,6 +413,7 @@ class MouseMover:
         # For anti-detection
         self.pattern_center_x = 0.0
         self.pattern_center_y = 0.0
+        self.pattern_bounds = (0, 0, 0, 0)
 
     def _test_keyboard_listener(self) -> bool:
         if not self.track_keys:
@@ -109,44 +438,42 @@ class MouseMover:
         print("Recording starts in:")
         for i in range(3, 0, -1):
             print(f"{i}...")
-            self._sleep_with_cancel(1.0, step=1.0)
+            self._sleep_with_cancel(1.0)
         print("GO! Move your mouse and click around to create a pattern!")
         self._fallback_record_mouse_movement(duration)
 
     def _fallback_record_mouse_movement(self, duration: int = 5):
         print("\nStarting polling-based fallback recorder...")
-        start_time = time.time()
-        self.mouse_positions = []
-        last_pos = self._get_mouse_position()
-        last_buttons = self._read_button_states()
+        start_time = time.perf_counter()
+        self.pattern = _RecordedPattern()
+        # The poll loop only samples; a consumer thread turns samples into events. Key callbacks
+        # feed the same queue, so the consumer is the only writer of the pattern columns.
+        samples: "queue.SimpleQueue[Optional[Tuple[Any, ...]]]" = queue.SimpleQueue()
+        consumer = threading.Thread(
+            target=self._record_consumer,
+            args=(samples, self.pattern),
+            name="MouseMoverRecorder",
+            daemon=True
+        )
+        consumer.start()
 
         keyboard_listener = None
-        key_events = {}
+        pressed_keys = set()
         if self.track_keys:
             try:
                 def on_key_press(key: Any):
-                    elapsed = time.time() - start_time
-                    key_name = key.char if hasattr(key, 'char') and key.char else str(key).split('.')[-1]
-                    if key_name not in key_events or not key_events[key_name].get('pressed'):
-                        self.mouse_positions.append({
-                            'type': 'key',
-                            'key': key_name,
-                            'pressed': True,
-                            'timestamp': elapsed
-                        })
-                        key_events[key_name] = {'pressed': True, 'time': elapsed}
+                    elapsed = time.perf_counter() - start_time
+                    key_name = _key_name(key)
+                    if key_name not in pressed_keys:
+                        pressed_keys.add(key_name)
+                        samples.put((EVENT_KEY, elapsed, key_name, True))
 
                 def on_key_release(key: Any):
-                    elapsed = time.time() - start_time
-                    key_name = key.char if hasattr(key, 'char') and key.char else str(key).split('.')[-1]
-                    if key_name in key_events and key_events[key_name].get('pressed'):
-                        self.mouse_positions.append({
-                            'type': 'key',
-                            'key': key_name,
-                            'pressed': False,
-                            'timestamp': elapsed
-                        })
-                        key_events[key_name] = {'pressed': False, 'time': elapsed}
+                    elapsed = time.perf_counter() - start_time
+                    key_name = _key_name(key)
+                    if key_name in pressed_keys:
+                        pressed_keys.discard(key_name)
+                        samples.put((EVENT_KEY, elapsed, key_name, False))
 
                 keyboard_listener = keyboard.Listener(on_press=on_key_press, on_release=on_key_release)
                 keyboard_listener.start()
@@ -156,42 +483,84 @@ class MouseMover:
                 self.track_keys = False
 
         poll_interval = 0.02
+        # Frame-local bindings for the polling loop
+        perf_counter = time.perf_counter
+        sleep = time.sleep
+        put = samples.put
+        get_position = self._get_mouse_position
+        read_buttons = self._read_button_states if self.is_windows else None
+        # Fixed-cadence polling: each tick is scheduled from the start, so sleep overshoot doesn't accumulate
+        next_tick = start_time
         end_time = start_time + duration
-        while time.time() < end_time:
-            self._check_alarm()
-            now = time.time()
-            ts = now - start_time
-            pos = self._get_mouse_position() or last_pos
-            if pos and last_pos and pos != last_pos:
-                self.mouse_positions.append({
-                    'type': 'move',
-                    'x': int(pos[0]),
-                    'y': int(pos[1]),
-                    'timestamp': ts
-                })
-                last_pos = pos
-
-            if self.is_windows and last_pos:
-                current_buttons = self._read_button_states()
-                for name, pressed in current_buttons.items():
-                    previous = last_buttons.get(name, False)
-                    if pressed != previous:
-                        self.mouse_positions.append({
-                            'type': 'click',
-                            'x': int(last_pos[0]),
-                            'y': int(last_pos[1]),
-                            'button': f'Button.{name}',
-                            'pressed': pressed,
-                            'timestamp': ts
-                        })
-                last_buttons = current_buttons
-
-            time.sleep(poll_interval)
-            self._check_alarm()
+        stopped = self._stop_event.is_set
+        while perf_counter() < end_time and not stopped():
+            put((
+                EVENT_MOVE,
+                perf_counter() - start_time,
+                get_position(),
+                read_buttons() if read_buttons else 0
+            ))
+            next_tick += poll_interval
+            sleep(max(0.0, next_tick - perf_counter()))
 
         if keyboard_listener:
             keyboard_listener.stop()
-        print(f"Fallback recording complete! Captured {len(self.mouse_positions)} events.")
+        samples.put(None)
+        consumer.join()
+        print(f"Fallback recording complete! Captured {len(self.pattern)} events.")
+
+    def _record_consumer(self, samples: "queue.SimpleQueue[Optional[Tuple[Any, ...]]]", pattern: _RecordedPattern) -> None:
+        # 1px jitter is dropped unless the cursor has been otherwise still for a while
+        min_move_pixels = 2
+        max_hold_seconds = 0.1
+        # Consecutive moves within this distance of where the previous move started are merged
+        coalesce_pixels = 3
+        kinds = pattern.kind
+        last_move_ts = 0.0
+        last_pos: Optional[Tuple[int, int]] = None
+        anchor_pos: Optional[Tuple[int, int]] = None
+        last_buttons = 0
+        while True:
+            sample = samples.get()
+            if sample is None:
+                return
+            if sample[0] == EVENT_KEY:
+                _, ts, key_name, pressed = sample
+                pattern.append_key(key_name, pressed, ts)
+                continue
+
+            _, ts, pos, current_buttons = sample
+            pos = pos or last_pos
+            if last_pos is None:
+                # First sample is the baseline, like the position read before polling started
+                last_pos = pos
+                last_buttons = current_buttons
+                continue
+            if pos and pos != last_pos:
+                moved = abs(pos[0] - last_pos[0]) + abs(pos[1] - last_pos[1])
+                if moved >= min_move_pixels or ts - last_move_ts >= max_hold_seconds:
+                    # Clicks and keys end a run: only a move directly after a move is overwritten
+                    if (
+                        kinds and kinds[-1] == EVENT_MOVE
+                        and abs(pos[0] - anchor_pos[0]) + abs(pos[1] - anchor_pos[1]) < coalesce_pixels
+                    ):
+                        pattern.replace_last_move(int(pos[0]), int(pos[1]), ts)
+                    else:
+                        pattern.append_move(int(pos[0]), int(pos[1]), ts)
+                        anchor_pos = last_pos
+                    last_pos = pos
+                    last_move_ts = ts
+
+            changed = current_buttons ^ last_buttons
+            if changed:
+                last_buttons = current_buttons
+                # Visit only the flipped bits, lowest button index first
+                while changed:
+                    bit = changed & -changed
+                    changed ^= bit
+                    pattern.append_click(
+                        int(last_pos[0]), int(last_pos[1]), bit.bit_length() - 1, bool(current_buttons & bit), ts
+                    )
 
     def _start_alarm_thread(self) -> None:
         if self.alarm_interval_mins <= 0:
@@ -216,7 +585,7 @@ class MouseMover:
                     return
                 remaining_interval -= 60
                 minutes_left_after_wait = minutes_remaining - 1
-                timestamp = datetime.now().strftime('%H:%M:%S')
+                timestamp = time.strftime('%H:%M:%S')
                 if minutes_left_after_wait > 0:
                     print(f"[{timestamp}] Alarm beep in {minutes_left_after_wait} minute(s)...")
                 else:
@@ -226,15 +595,62 @@ class MouseMover:
                     return
             if self._alarm_stop_event.is_set():
                 break
-            self._trigger_alarm()
+            try:
+                self._trigger_alarm()
+            except Exception as e:
+                # Keep the thread alive; nothing else restarts it
+                print(f"[WARNING] Alarm failed: {type(e).__name__}: {e}")
 
     def _stop_alarm_thread(self) -> None:
-        if not self.alarm_thread:
+        # Safe to call repeatedly, and on an instance whose __init__ did not finish
+        thread = getattr(self, 'alarm_thread', None)
+        if thread is None:
             return
         self._alarm_stop_event.set()
-        self.alarm_thread.join(timeout=2.0)
+        thread.join(timeout=2.0)
+        if thread.is_alive():
+            print("[WARNING] Alarm thread did not stop within 2 seconds; leaving it to exit with the process")
         self.alarm_thread = None
 
+    def _query_screen_bounds(self) -> Tuple[int, int, int, int]:
+        # (left, top, right, bottom) of the virtual desktop; legacy 4K box when unknown
+        if self._user32 is not None:
+            try:
+                metrics = self._user32.GetSystemMetrics
+                left, top = metrics(76), metrics(77)
+                width, height = metrics(78), metrics(79)
+                if width > 0 and height > 0:
+                    return (left, top, left + width - 1, top + height - 1)
+            except Exception:
+                pass
+        return (0, 0, 3840, 2160)
+
+    def _bind_cursor_setter(self) -> Callable[[int, int], Any]:
+        # Replay writes go straight to SetCursorPos on Windows, skipping pynput's wrapper layers
+        if self._user32 is not None:
+            set_cursor_pos = self._user32.SetCursorPos
+            set_cursor_pos.argtypes = (ctypes.c_int, ctypes.c_int)
+            set_cursor_pos.restype = ctypes.c_int
+            return set_cursor_pos
+        ctrl = self.mouse_controller
+        position_setter = type(ctrl).position.fset
+        return lambda x, y: position_setter(ctrl, (x, y))
+
+    def _raise_timer_resolution(self) -> None:
+        try:
+            self._timer_period_raised = ctypes.windll.winmm.timeBeginPeriod(1) == 0
+        except Exception:
+            self._timer_period_raised = False
+
+    def _restore_timer_resolution(self) -> None:
+        if not self._timer_period_raised:
+            return
+        try:
+            ctypes.windll.winmm.timeEndPeriod(1)
+        except Exception:
+            pass
+        self._timer_period_raised = False
+
     def _get_mouse_position(self) -> Optional[Tuple[int, int]]:
         try:
             pos = self.mouse_controller.position
@@ -242,18 +658,14 @@ class MouseMover:
         except Exception:
             return None
 
-    def _win_get_async(self, key: int) -> bool:
-        if not self.is_windows:
-            return False
-        try:
-            return bool(ctypes.windll.user32.GetAsyncKeyState(key) & 0x8000)
-        except Exception:
-            return False
-
-    def _read_button_states(self) -> Dict[str, bool]:
-        if not self.is_windows:
-            return {}
-        return {name: self._win_get_async(code) for name, code in self._vk_codes.items()}
+    def _read_button_states(self) -> int:
+        get_async = self._GetAsyncKeyState
+        if get_async is None:
+            return 0
+        mask = 0
+        for i, (_, vk) in enumerate(self._vk_list):
+            mask |= (get_async(vk) & 0x8000 != 0) << i
+        return mask
 
     def _has_significant_movement(
         self,
@@ -266,123 +678,127 @@ class MouseMover:
         th = threshold if threshold is not None else self.activity_movement_threshold
         return abs(current[0] - previous[0]) > th or abs(current[1] - previous[1]) > th
 
-    def _buttons_changed(self, previous: Dict[str, bool], current: Dict[str, bool]) -> bool:
-        for name in self._vk_codes.keys():
-            if current.get(name) != previous.get(name):
-                return True
-        return False
-
-    def _sleep_with_cancel(self, duration: float, step: float = 0.5) -> bool:
-        if duration <= 0:
-            self._check_alarm()
-            return self.running
-        end_time = time.time() + duration
-        while self.running:
-            self._check_alarm()
-            now = time.time()
-            if now >= end_time:
-                break
-            remaining = end_time - now
-            sleep_chunk = max(0.01, min(step, remaining))
-            time.sleep(sleep_chunk)
-            self._check_alarm()
-        self._check_alarm()
-        return self.running
+    def _sleep_with_cancel(self, duration: float) -> bool:
+        # Returns False as soon as stop() is called
+        return not _wait_event(self._stop_event, duration)
 
     def _trigger_alarm(self) -> None:
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"[{timestamp}] Alarm interval reached - playing 1 second beep...")
-        played_sound = False
+        print(f"[{time.strftime('%H:%M:%S')}] Alarm interval reached - playing 1 second beep...")
+        self._beep()
+
+    def _resolve_beep(self) -> None:
+        # First alarm: try each sound source in order and keep the first that works for later alarms
         if self.is_windows and winsound is not None:
-            try:
+            def dual_tone() -> None:
                 winsound.Beep(1500, 750)
                 winsound.Beep(1000, 500)
-                played_sound = True
+
+            try:
+                dual_tone()
+                self._beep = dual_tone
+                return
             except RuntimeError:
                 pass
-            if not played_sound:
-                alias_flags = winsound.SND_ALIAS | winsound.SND_ASYNC
-                for alias in ('SystemHand', 'SystemExclamation', 'SystemAsterisk'):
-                    try:
-                        winsound.PlaySound(alias, alias_flags)
-                        time.sleep(1)
-                        winsound.PlaySound(None, 0)
-                        played_sound = True
-                        break
-                    except RuntimeError:
-                        continue
-                if played_sound:
+            alias_flags = winsound.SND_ALIAS | winsound.SND_ASYNC
+            for alias in ('SystemHand', 'SystemExclamation', 'SystemAsterisk'):
+                def system_sound(alias: str = alias) -> None:
+                    winsound.PlaySound(alias, alias_flags)
+                    time.sleep(1)
+                    winsound.PlaySound(None, 0)
+
+                try:
+                    system_sound()
+                    self._beep = system_sound
                     return
+                except RuntimeError:
+                    continue
+        self._beep = self._terminal_bell
+        self._beep()
+
+    def _terminal_bell(self) -> None:
         print('\a', end='', flush=True)
         time.sleep(1)
 
-    def _check_alarm(self) -> None:
-        if self.alarm_interval_mins <= 0:
-            return
-        if not self.alarm_thread or not self.alarm_thread.is_alive():
-            if not self._alarm_stop_event.is_set():
-                self._start_alarm_thread()
-
     def wait_for_pre_replay_quiet_period(self) -> bool:
         quiet_window = self.activity_window_seconds
         postpone_window = self.activity_postpone_seconds
         if quiet_window <= 0:
-            self._check_alarm()
             return True
         print(
             f"Ensuring {quiet_window:.0f}-second inactivity window before replay. "
             "Move the mouse or click to delay."
         )
+        self._ensure_activity_listener()
         while self.running:
-            self._check_alarm()
-            window_start = time.time()
-            last_pos = self._get_mouse_position()
-            last_buttons = self._read_button_states()
-            quiet_period_ok = True
-            activity_reason = "mouse activity"
-            while self.running and (time.time() - window_start) < quiet_window:
-                if not self._sleep_with_cancel(self.activity_poll_interval, step=self.activity_poll_interval):
-                    return False
-                current_pos = self._get_mouse_position()
-                if self._has_significant_movement(last_pos, current_pos):
-                    quiet_period_ok = False
-                    activity_reason = "movement"
-                    break
-                current_buttons = self._read_button_states()
-                if self._buttons_changed(last_buttons, current_buttons):
-                    quiet_period_ok = False
-                    activity_reason = "click"
-                    break
-                last_pos = current_pos
-                last_buttons = current_buttons
-            if quiet_period_ok:
+            # One wait per window: the listener sets the event on user input, stop() sets it too.
+            # The anchor goes first so a move landing between the two can't compare against a stale one
+            self._activity_anchor = self._get_mouse_position()
+            self._activity_event.clear()
+            activity_detected = _wait_event(self._activity_event, quiet_window)
+            if not self.running:
+                return False
+            if not activity_detected:
                 print("No recent activity detected. Proceeding with replay...")
                 return True
             print(
-                f"User {activity_reason} detected. Postponing start by {postpone_window:.0f} seconds..."
+                f"User {self._last_activity_reason} detected. Postponing start by {postpone_window:.0f} seconds..."
             )
-            if not self._sleep_with_cancel(postpone_window, step=0.25):
+            if not self._sleep_with_cancel(postpone_window):
                 return False
         return False
 
+    @property
+    def mouse_positions(self) -> List[Dict[str, Any]]:
+        # Read-only view in the original list-of-dicts format; built on demand from the columns
+        return self.pattern.to_events()
+
     def save_pattern(self):
-        with open(self.pattern_file, 'w') as f:
-            json.dump(self.mouse_positions, f)
+        with open(self.pattern_file, 'wb') as f:
+            f.write(self.pattern.to_bytes())
         print(f"Pattern saved to {self.pattern_file}")
 
+    def _pattern_available(self) -> bool:
+        return os.path.exists(self.pattern_file) or os.path.exists(self.legacy_pattern_file)
+
+    def _read_pattern_file(self) -> _RecordedPattern:
+        try:
+            with open(self.pattern_file, 'rb') as f:
+                return _RecordedPattern.from_bytes(f.read())
+        except FileNotFoundError:
+            if not os.path.exists(self.legacy_pattern_file):
+                raise
+        # One-time migration from the original JSON format
+        print(f"Converting legacy pattern {self.legacy_pattern_file}...")
+        try:
+            from orjson import loads
+        except ImportError:  # pragma: no cover - optional speedup
+            loads = json.loads
+        with open(self.legacy_pattern_file, 'rb') as f:
+            events = loads(f.read())
+        self.pattern = _RecordedPattern.from_events(events)
+        self.save_pattern()
+        return self.pattern
+
     def load_pattern(self):
         try:
-            with open(self.pattern_file, 'r') as f:
-                self.mouse_positions = json.load(f)
-            # Compute center only from valid x/y entries
-            xs = [p['x'] for p in self.mouse_positions if 'x' in p and isinstance(p['x'], (int, float))]
-            ys = [p['y'] for p in self.mouse_positions if 'y' in p and isinstance(p['y'], (int, float))]
-            if xs and ys:
+            self.pattern = self._read_pattern_file()
+            pattern = self.pattern
+            pattern.clamp(*self.screen_bounds)
+            # Compute center and bounding box only from events that carry coordinates
+            xs, ys = pattern.x, pattern.y
+            if pattern.keys:
+                # One pass over kind builds the selector; compress then filters both columns in C
+                has_coords = bytes(kind != EVENT_KEY for kind in pattern.kind)
+                xs = array('i', compress(xs, has_coords))
+                ys = array('i', compress(ys, has_coords))
+            if xs:
                 self.pattern_center_x = sum(xs) / len(xs)
                 self.pattern_center_y = sum(ys) / len(ys)
+                self.pattern_bounds = (min(xs), min(ys), max(xs), max(ys))
             else:
                 self.pattern_center_x = self.pattern_center_y = 0.0
-            print(f"Loaded pattern with {len(self.mouse_positions)} positions. Center: ({self.pattern_center_x:.1f}, {self.pattern_center_y:.1f})")
+                self.pattern_bounds = (0, 0, 0, 0)
+            print(f"Loaded pattern with {len(pattern)} positions. Center: ({self.pattern_center_x:.1f}, {self.pattern_center_y:.1f})")
             return True
         except FileNotFoundError:
             print("No saved pattern found.")
@@ -391,15 +807,77 @@ class MouseMover:
             print(f"Error loading pattern: {e}")
             return False
 
+    def _arm_grace_period(self) -> None:
+        self._grace_deadline = time.monotonic() + self.grace_period_duration
+        self.grace_period_active = True
+
+    def _remember_position(self, x: int, y: int) -> None:
+        self._recent_positions[self._recent_index] = (x, y)
+        self._recent_index = (self._recent_index + 1) % len(self._recent_positions)
+
+    def _ensure_activity_listener(self) -> None:
+        if self._activity_listener is not None and self._activity_listener.is_alive():
+            return
+        self._activity_listener = mouse.Listener(on_move=self._on_mouse_move, on_click=self._on_mouse_click)
+        self._activity_listener.start()
+
+    def _on_mouse_move(self, x: int, y: int, injected: bool = False) -> None:
+        if injected:
+            return
+        pos = (int(x), int(y))
+        if self.currently_replaying:
+            # OS-level move events that don't match a position we just wrote are the user's
+            if self.grace_period_active or pos in self._recent_positions:
+                return
+            self.user_moved_mouse = True
+        elif self._activity_anchor is None:
+            # Position was unreadable when the window started; the first reported move anchors it
+            self._activity_anchor = pos
+            return
+        elif not self._has_significant_movement(self._activity_anchor, pos):
+            return
+        self._last_activity_reason = "movement"
+        self._activity_event.set()
+
+    def _on_mouse_click(self, x: int, y: int, button: Any, pressed: bool, injected: bool = False) -> None:
+        if injected or self.currently_replaying:
+            return
+        self._last_activity_reason = "click"
+        self._activity_event.set()
+
+    def _replay_segment(self, path: List[Tuple[int, int]], sleeps: List[float]) -> None:
+        # Step kernel: write each position, sleeping in batches of at least 8 ms or one timer tick
+        set_cursor = self._set_cursor
+        remember = self._remember_position
+        granularity = self._timer_resolution
+        batch = max(granularity, _MIN_SLEEP_BATCH_S)
+        precise_sleep = _precise_sleep
+        stopped = self._stop_event.is_set
+        pending_sleep = 0.0
+        for (x, y), step_sleep in zip(path, sleeps):
+            if stopped() or self.user_moved_mouse:
+                return
+
+            remember(x, y)
+            set_cursor(x, y)
+
+            pending_sleep += step_sleep
+            if pending_sleep >= batch:
+                precise_sleep(pending_sleep, granularity)
+                pending_sleep = 0.0
+
+        if pending_sleep > 0 and not self.user_moved_mouse:
+            precise_sleep(pending_sleep, granularity)
+
     def replay_pattern(self):
-        if not self.mouse_positions:
+        pattern = self.pattern
+        if not pattern:
             print("No pattern to replay!")
             return
 
         print("Replaying mouse pattern with human-like imperfections...")
         self.currently_replaying = True
         self.user_moved_mouse = False
-        self._check_alarm()
 
         # Anti-detection variation
         if random.random() < 0.92:
@@ -410,199 +888,201 @@ class MouseMover:
             global_offset_x = global_offset_y = 0
             scale = 1.0
 
-        selected_points = []
-        total_points = len(self.mouse_positions)
-        for i, pos in enumerate(self.mouse_positions):
-            is_click = pos.get('type') == 'click'
-            if is_click or i == 0 or i == total_points - 1 or random.random() < 0.85:
-                selected_points.append(pos)
+        # Clamping is only needed when the shifted/scaled bounding box leaves the screen
+        screen_left, screen_top, screen_right, screen_bottom = self.screen_bounds
+        min_x, min_y, max_x, max_y = self.pattern_bounds
+        center_x, center_y = self.pattern_center_x, self.pattern_center_y
+        needs_clamp = not (
+            screen_left <= (min_x - center_x) * scale + center_x + global_offset_x
+            and (max_x - center_x) * scale + center_x + global_offset_x <= screen_right
+            and screen_top <= (min_y - center_y) * scale + center_y + global_offset_y
+            and (max_y - center_y) * scale + center_y + global_offset_y <= screen_bottom
+        )
+
+        # Single pass: clicks and both endpoints are always kept, ~85% of the rest
+        kinds = pattern.kind
+        total_points = len(pattern)
+        last_index = total_points - 1
+        keep_roll = random.random
+        selected_points = [
+            i for i in range(total_points)
+            if kinds[i] == EVENT_CLICK or i == 0 or i == last_index or keep_roll() < 0.85
+        ]
+
+        # Transform every selected move/click once (scale about the center, offset, clamp) and
+        # size each segment from the distance to the previous target; key events get None
+        xs, ys = pattern.x, pattern.y
+        shift_x = center_x * (1.0 - scale) + global_offset_x
+        shift_y = center_y * (1.0 - scale) + global_offset_y
+        hypot = math.hypot
+        targets: List[Optional[Tuple[int, int]]] = []
+        segment_steps: List[Optional[int]] = []
+        prev_target = None
+        for i in selected_points:
+            if kinds[i] == EVENT_KEY:
+                targets.append(None)
+                segment_steps.append(None)
+                continue
+            target_x = int(xs[i] * scale + shift_x)
+            target_y = int(ys[i] * scale + shift_y)
+            if needs_clamp:
+                target_x = max(screen_left, min(target_x, screen_right))
+                target_y = max(screen_top, min(target_y, screen_bottom))
+            targets.append((target_x, target_y))
+            # 0 marks a repeat of the previous target: nothing to animate, only time to wait out
+            segment_steps.append(
+                None if prev_target is None
+                else 0 if (target_x, target_y) == prev_target
+                else max(5, int(hypot(target_x - prev_target[0], target_y - prev_target[1]) / 30))
+            )
+            prev_target = (target_x, target_y)
+
+        # Trailing micro-pause per point, drawn up front: 15% long, then 30% of the rest short
+        uniform = random.uniform
+        pauses = []
+        for _ in selected_points:
+            roll = keep_roll()
+            pauses.append(
+                uniform(0.02, 0.15) if roll < 0.15
+                else uniform(0.005, 0.025) if roll < 0.405
+                else 0.0
+            )
 
         print(f"Selected {len(selected_points)} points from {total_points} (~{len(selected_points)/total_points*100:.1f}%)")
 
+        # Frame-local bindings for the replay loop
+        ctrl = self.mouse_controller
+        sleep = time.sleep
+        choices = random.choices
+        stopped = self._stop_event.is_set
+
         prev_timestamp = 0.0
         self.held_modifiers = set()
+        # The cursor is read once; after that each segment starts where the previous one ended
+        current_x, current_y = (int(v) for v in ctrl.position)
 
-        for pos in selected_points:
-            self._check_alarm()
-            if not self.running or self.user_moved_mouse:
-                if self.user_moved_mouse:
-                    print("\n⚠️ User mouse movement detected! Stopping replay and resetting interval...")
-                break
+        self._recent_positions = [None] * len(self._recent_positions)
+        self._ensure_activity_listener()
+        try:
+            for i, target, steps, pause in zip(selected_points, targets, segment_steps, pauses):
+                kind = kinds[i]
+                if stopped() or self.user_moved_mouse:
+                    break
+                # Grace is coarse, so it is checked once per segment rather than per step
+                if self.grace_period_active and time.monotonic() > self._grace_deadline:
+                    self.grace_period_active = False
+                    print("(Grace period ended - user detection now active)")
+
+                current_timestamp = pattern.t[i]
+                time_to_move = current_timestamp - prev_timestamp
+
+                # Movement logic only for events with coordinates
+                if target is not None:
+                    target_x, target_y = target
+                    if time_to_move > 0:
+                        time_variation = uniform(0.85, 1.15)
+                        time_to_move *= time_variation
+
+                        if steps is None:
+                            steps = max(5, int(hypot(target_x - current_x, target_y - current_y) / 30))
+                        if steps == 0:
+                            sleep(time_to_move)
+                        else:
+                            base_sleep_per_step = time_to_move / steps
+                            path = _eased_path(
+                                current_x, current_y, target_x, target_y,
+                                choices(_TREMOR_OFFSETS, k=2 * steps), self.screen_bounds
+                            )
+                            sleeps = [base_sleep_per_step * (0.8 + 0.4 * keep_roll()) for _ in path]
+                            self._replay_segment(path, sleeps)
+                            current_x, current_y = path[-1]
+                    else:
+                        self._remember_position(target_x, target_y)
+                        self._set_cursor(target_x, target_y)
+                        current_x, current_y = target_x, target_y
+                elif time_to_move > 0:
+                    # Preserve timing for key events
+                    sleep(time_to_move * uniform(0.85, 1.15))
+
+                # Click handling
+                if kind == EVENT_CLICK:
+                    button = self._buttons[pattern.button[i]]
+                    if button is None:
+                        pass
+                    elif pattern.pressed[i]:
+                        ctrl.press(button)
+                    else:
+                        ctrl.release(button)
 
-            # Position handling only for events with coordinates
-            target_x = target_y = None
-            if pos.get('type') in ('move', 'click') and 'x' in pos and 'y' in pos:
-                scaled_x = (pos['x'] - self.pattern_center_x) * scale + self.pattern_center_x
-                scaled_y = (pos['y'] - self.pattern_center_y) * scale + self.pattern_center_y
-                target_x = int(scaled_x + global_offset_x)
-                target_y = int(scaled_y + global_offset_y)
-                target_x = max(0, min(target_x, 3840))
-                target_y = max(0, min(target_y, 2160))
-
-            current_timestamp = pos['timestamp']
-            time_to_move = current_timestamp - prev_timestamp
-
-            # Movement logic only when we have a valid target
-            if target_x is not None and target_y is not None:
-                if time_to_move > 0:
-                    time_variation = random.uniform(0.85, 1.15)
-                    time_to_move *= time_variation
-
-                    current_x, current_y = self.mouse_controller.position
-                    distance = ((target_x - current_x) ** 2 + (target_y - current_y) ** 2) ** 0.5
-                    steps = max(5, int(distance / 30))
-                    base_sleep_per_step = time_to_move / steps if steps > 0 else 0.001
-
-                    for step in range(steps):
-                        if not self.running or self.user_moved_mouse:
-                            if self.user_moved_mouse:
-                                print("\n⚠️ User mouse movement detected! Stopping replay and resetting interval...")
-                            break
-
-                        progress = (step + 1) / steps
-                        eased_progress = progress * progress * (3.0 - 2.0 * progress)
-
-                        expected_x = int(current_x + (target_x - current_x) * eased_progress)
-                        expected_y = int(current_y + (target_y - current_y) * eased_progress)
-
-                        tremor_x = random.randint(-2, 2)
-                        tremor_y = random.randint(-2, 2)
-                        actual_x = expected_x + tremor_x
-                        actual_y = expected_y + tremor_y
-
-                        self.mouse_controller.position = (actual_x, actual_y)
-
-                        sleep_variation = random.uniform(0.8, 1.2)
-                        time.sleep(base_sleep_per_step * sleep_variation)
-                        self._check_alarm()
-
-                        if self.grace_period_active and self.grace_period_start is not None:
-                            if time.time() - self.grace_period_start > self.grace_period_duration:
-                                self.grace_period_active = False
-                                print("(Grace period ended - user detection now active)")
-
-                        if not self.grace_period_active:
-                            cx, cy = self.mouse_controller.position
-                            if abs(cx - actual_x) > 20 or abs(cy - actual_y) > 20:
-                                self.user_moved_mouse = True
-                                break
-                else:
-                    self.mouse_controller.position = (target_x, target_y)
-            elif time_to_move > 0:
-                # Preserve timing for key events
-                time.sleep(time_to_move * random.uniform(0.85, 1.15))
-
-            # Click handling
-            if pos.get('type') == 'click':
-                button_str = pos['button']
-                button = mouse.Button.left
-                if 'right' in button_str:
-                    button = mouse.Button.right
-                elif 'middle' in button_str:
-                    button = mouse.Button.middle
-                elif 'x1' in button_str:
-                    button = mouse.Button.x1
-                elif 'x2' in button_str:
-                    button = mouse.Button.x2
-
-                if pos['pressed']:
-                    self.mouse_controller.press(button)
-                else:
-                    self.mouse_controller.release(button)
+                # Key handling
+                if kind == EVENT_KEY:
+                    key_str = pattern.keys[i]
+                    try:
+                        kb = self._kb
+                        is_pressed = pattern.pressed[i]
 
-            # Key handling
-            if pos.get('type') == 'key':
-                key_str = pos['key']
-                try:
-                    kb = keyboard.Controller()
-                    is_pressed = pos['pressed']
-
-                    modifiers = {
-                        'shift': keyboard.Key.shift,
-                        'ctrl': keyboard.Key.ctrl,
-                        'alt': keyboard.Key.alt,
-                        'cmd': keyboard.Key.cmd,
-                    }
-
-                    if key_str in modifiers:
-                        mod_key = modifiers[key_str]
-                        if is_pressed:
-                            kb.press(mod_key)
-                            self.held_modifiers.add(key_str)
-                        else:
-                            kb.release(mod_key)
-                            self.held_modifiers.discard(key_str)
-
-                    elif key_str.startswith('Key.'):
-                        key_name = key_str.split('.')[-1]
-                        special_keys = {
-                            'enter': keyboard.Key.enter,
-                            'backspace': keyboard.Key.backspace,
-                            'space': keyboard.Key.space,
-                            'tab': keyboard.Key.tab,
-                            'esc': keyboard.Key.esc,
-                            'up': keyboard.Key.up,
-                            'down': keyboard.Key.down,
-                            'left': keyboard.Key.left,
-                            'right': keyboard.Key.right,
-                            'delete': keyboard.Key.delete,
-                            'page_up': keyboard.Key.page_up,
-                            'page_down': keyboard.Key.page_down,
-                            'home': keyboard.Key.home,
-                            'end': keyboard.Key.end,
-                            'f1': keyboard.Key.f1,
-                            'f2': keyboard.Key.f2,
-                            'f3': keyboard.Key.f3,
-                            'f4': keyboard.Key.f4,
-                            'f5': keyboard.Key.f5,
-                            'f6': keyboard.Key.f6,
-                            'f7': keyboard.Key.f7,
-                            'f8': keyboard.Key.f8,
-                            'f9': keyboard.Key.f9,
-                            'f10': keyboard.Key.f10,
-                            'f11': keyboard.Key.f11,
-                            'f12': keyboard.Key.f12,
-                        }
-                        if key_name in special_keys:
-                            key_obj = special_keys[key_name]
+                        if key_str in self._modifier_keys:
+                            mod_key = self._modifier_keys[key_str]
+                            if is_pressed:
+                                kb.press(mod_key)
+                                self.held_modifiers.add(key_str)
+                            else:
+                                kb.release(mod_key)
+                                self.held_modifiers.discard(key_str)
+
+                        elif key_str in self._special_keys:
+                            key_obj = self._special_keys[key_str]
                             if is_pressed:
                                 kb.press(key_obj)
                             else:
                                 kb.release(key_obj)
 
-                    else:
-                        if is_pressed and len(key_str) == 1:
-                            time.sleep(random.uniform(0.045, 0.22))
-                            if random.random() < 0.18:
-                                continue
-                            try:
-                                kb.press(key_str)
-                                time.sleep(random.uniform(0.01, 0.04))
-                                kb.release(key_str)
-                            except:
-                                kb.type(key_str)
-                except Exception:
-                    pass
-
-            prev_timestamp = current_timestamp
-
-            if random.random() < 0.15 and not self.user_moved_mouse:
-                time.sleep(random.uniform(0.02, 0.15))
-                self._check_alarm()
-            elif random.random() < 0.3 and not self.user_moved_mouse:
-                time.sleep(random.uniform(0.005, 0.025))
-                self._check_alarm()
-
-        self.currently_replaying = False
-        if not self.user_moved_mouse:
+                        else:
+                            if is_pressed and len(key_str) == 1:
+                                sleep(uniform(0.045, 0.22))
+                                if keep_roll() < 0.18:
+                                    continue
+                                try:
+                                    kb.press(key_str)
+                                    sleep(uniform(0.01, 0.04))
+                                    kb.release(key_str)
+                                except:
+                                    kb.type(key_str)
+                    except Exception:
+                        pass
+
+                prev_timestamp = current_timestamp
+
+                if pause and not self.user_moved_mouse:
+                    sleep(pause)
+
+        finally:
+            self.currently_replaying = False
+
+        # Reported once here, whether the move was caught between events or inside a segment
+        if self.user_moved_mouse:
+            print("\n⚠️ User mouse movement detected! Stopping replay and resetting interval...")
+        else:
             print("Pattern replay complete!")
 
+    @property
+    def running(self) -> bool:
+        # The stop event is the single source of truth; Event.wait sleeps wake as soon as it is set
+        return not self._stop_event.is_set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._activity_event.set()
+
     def setup_keyboard_listener(self):
+        if self._keyboard_listener is not None and self._keyboard_listener.is_alive():
+            return self._keyboard_listener
+
         def on_press(key: Any):
             try:
                 if key == keyboard.Key.f10:
                     print("\n\nF10 pressed! Stopping script...")
-                    self.running = False
+                    self.stop()
                     return False
             except AttributeError:
                 pass
@@ -610,28 +1090,39 @@ class MouseMover:
 
         listener = keyboard.Listener(on_press=on_press)
         listener.start()
+        self._keyboard_listener = listener
         return listener
 
+    def _record_new_pattern(self) -> None:
+        self.record_mouse_movement(5)
+        if not self.running:
+            # Stopped mid-recording: keep the previously saved pattern untouched
+            return
+        self.save_pattern()
+        self.load_pattern()  # Load to compute center
+        self.grace_period_duration = 5.0
+
     def _run_alarm_only(self) -> None:
         if self.alarm_interval_mins <= 0:
             print("No interval or alarm specified. Nothing to do.")
             return
         print("\nAlarm-only mode enabled (no mouse automation configured).")
+        self._graceful_stop = True
         self.setup_keyboard_listener()
         end_time = None
         if self.duration_mins:
-            end_time = datetime.now() + timedelta(minutes=self.duration_mins)
-            print(f"Running alarm for {self.duration_mins} minute(s) (until {end_time.strftime('%H:%M:%S')})")
+            end_time = time.monotonic() + self.duration_mins * 60
+            end_str = time.strftime('%H:%M:%S', time.localtime(time.time() + self.duration_mins * 60))
+            print(f"Running alarm for {self.duration_mins} minute(s) (until {end_str})")
         else:
             print("Running alarm indefinitely (press F10 to stop)")
         print(f"Playing 1-second beep every {self.alarm_interval_mins} minute(s).\n")
-        while self.running:
-            self._check_alarm()
-            if end_time and datetime.now() >= end_time:
-                print("\nDuration limit reached. Stopping alarm...")
-                break
-            if not self._sleep_with_cancel(1.0, step=1.0):
-                break
+        # The alarm thread does the work; just wait for F10/Ctrl+C or the duration limit
+        if end_time is None:
+            while not self._stop_event.wait(1.0):
+                pass
+        elif self._sleep_with_cancel(end_time - time.monotonic()):
+            print("\nDuration limit reached. Stopping alarm...")
         print("\n" + "=" * 50)
         print("Script stopped!")
         print("=" * 50)
@@ -645,47 +1136,44 @@ class MouseMover:
             self._run_alarm_only()
             return
 
-        pattern_exists = os.path.exists(self.pattern_file)
+        pattern_exists = self._pattern_available()
 
         if pattern_exists:
             choice = input("Saved pattern found. Use it? (y/n) or 'r' to reset: ").lower()
             if choice == 'r':
                 print("Resetting pattern...")
-                self.record_mouse_movement(5)
-                self.save_pattern()
-                self.load_pattern()  # Load to compute center
-                self.grace_period_duration = 5.0
+                self._record_new_pattern()
             elif choice == 'y':
                 self.load_pattern()
                 self.grace_period_duration = 0.5
             else:
-                self.record_mouse_movement(5)
-                self.save_pattern()
-                self.load_pattern()
-                self.grace_period_duration = 5.0
+                self._record_new_pattern()
         else:
             print("No saved pattern found. Recording new pattern...")
-            self.record_mouse_movement(5)
-            self.save_pattern()
-            self.load_pattern()  # Load to compute center
-            self.grace_period_duration = 5.0
+            self._record_new_pattern()
 
-        if not self.mouse_positions:
+        if not self.running:
+            return
+        if not self.pattern:
             print("No pattern available. Exiting.")
             return
 
+        # From here on every wait watches the stop event, so Ctrl+C can stop gracefully
+        self._graceful_stop = True
         print("\nStarting in 3 seconds...")
         for i in range(3, 0, -1):
             print(f"{i}...")
-            self._sleep_with_cancel(1.0, step=1.0)
+            self._sleep_with_cancel(1.0)
         print("Starting!\n")
 
         self.setup_keyboard_listener()
 
+        # Scheduling runs on the monotonic clock so wall-clock adjustments can't stretch or cut intervals
         end_time = None
         if self.duration_mins:
-            end_time = datetime.now() + timedelta(minutes=self.duration_mins)
-            print(f"\nRunning for {self.duration_mins} minutes (until {end_time.strftime('%H:%M:%S')})")
+            end_time = time.monotonic() + self.duration_mins * 60
+            end_str = time.strftime('%H:%M:%S', time.localtime(time.time() + self.duration_mins * 60))
+            print(f"\nRunning for {self.duration_mins} minutes (until {end_str})")
         else:
             print("\nRunning indefinitely (press F10 to stop)")
 
@@ -697,23 +1185,25 @@ class MouseMover:
         else:
             print("Alarm beep disabled.\n")
 
-        self.grace_period_start = time.time()
-        self.grace_period_active = True
+        self._arm_grace_period()
         print(f"({self.grace_period_duration}-second grace period active - user detection will start after)\n")
 
         iteration = 0
+        # Each replay is scheduled from the previous one's slot, so replay time doesn't add drift
+        next_deadline = time.monotonic()
         while self.running:
-            self._check_alarm()
             iteration += 1
-            current_time = datetime.now()
 
-            if end_time and current_time >= end_time:
+            if end_time and time.monotonic() >= end_time:
                 print("\nDuration limit reached. Stopping...")
                 break
 
-            print(f"\n[{current_time.strftime('%H:%M:%S')}] Iteration #{iteration}")
+            print(f"\n[{time.strftime('%H:%M:%S')}] Iteration #{iteration}")
             if not self.wait_for_pre_replay_quiet_period():
                 break
+            # The slot starts when the replay does: time spent postponed for user activity drops
+            # missed slots instead of replaying them back to back
+            next_deadline = max(next_deadline, time.monotonic())
             self.replay_pattern()
 
             if not self.running:
@@ -722,16 +1212,15 @@ class MouseMover:
             if self.user_moved_mouse:
                 print("Interval timer reset! Waiting full interval before next replay...")
                 self.user_moved_mouse = False
-                self.grace_period_start = time.time()
-                self.grace_period_active = True
+                self._arm_grace_period()
                 print(f"({self.grace_period_duration}-second grace period restarted after manual control)\n")
+                next_deadline = time.monotonic()
 
-            random_variation = random.uniform(0.85, 1.15)
-            actual_wait_mins = self.interval_mins * random_variation
-            wait_seconds = actual_wait_mins * 60
+            next_deadline += self._base_wait_s * (0.85 + 0.30 * random.random())
+            wait_seconds = max(0.0, next_deadline - time.monotonic())
 
-            print(f"Waiting ~{actual_wait_mins:.1f} minute(s) until next movement...")
-            if not self._sleep_with_cancel(wait_seconds, step=1.0):
+            print(f"Waiting ~{wait_seconds / 60:.1f} minute(s) until next movement...")
+            if not self._sleep_with_cancel(wait_seconds):
                 break
 
         print("\n" + "=" * 50)
@@ -739,7 +1228,10 @@ class MouseMover:
         print("=" * 50)
 
 
-def main():
+def _build_parser() -> "argparse.ArgumentParser":
+    # argparse is only imported when there are arguments to parse
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Automated mouse mover - records and replays mouse patterns with human-like imperfections",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -760,33 +1252,68 @@ Examples:
                         help='Alarm interval in minutes')
     parser.add_argument('-k', '--track-keys', action='store_true',
                         help='Enable keyboard tracking and replay')
+    return parser
 
-    args = parser.parse_args()
 
+@lru_cache(maxsize=4)
+def _parse_args_cached(argv: Tuple[str, ...]) -> "argparse.Namespace":
+    if not argv:
+        raise ValueError("Provide either --interval or a positive --alarm")
+    args = _build_parser().parse_args(argv)
     if args.interval is not None and args.interval <= 0:
-        print("Error: Interval must be greater than 0")
-        return
+        raise ValueError("Interval must be greater than 0")
     if args.duration is not None and args.duration <= 0:
-        print("Error: Duration must be greater than 0")
-        return
+        raise ValueError("Duration must be greater than 0")
     if args.alarm < 0:
-        print("Error: Alarm must be >= 0")
-        return
+        raise ValueError("Alarm must be >= 0")
     if args.interval is None and args.alarm <= 0:
-        print("Error: Provide either --interval or a positive --alarm")
+        raise ValueError("Provide either --interval or a positive --alarm")
+    return args
+
+
+def parse_args(argv: Tuple[str, ...]) -> "argparse.Namespace":
+    """Parse and validate command-line arguments, raising ValueError for invalid values."""
+    # Each caller gets its own copy, so mutating the result can't change the cached one
+    args = _parse_args_cached(argv)
+    return type(args)(**vars(args))
+
+
+def main():
+    try:
+        args = parse_args(tuple(sys.argv[1:]))
+    except ValueError as e:
+        print(f"Error: {e}")
         return
 
     mover = MouseMover(args.interval, args.duration, args.alarm, args.track_keys)
 
+    interrupted = False
+
+    def on_sigint(signum, frame):
+        nonlocal interrupted
+        if not mover._graceful_stop:
+            # Prompt or recording in progress: abort right away, before anything is saved
+            raise KeyboardInterrupt
+        # First Ctrl+C stops gracefully; restore the default so a second one interrupts immediately
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        print("\n\nStopping... (press Ctrl+C again to force quit)")
+        interrupted = True
+        mover.stop()
+        mover._stop_alarm_thread()
+
+    signal.signal(signal.SIGINT, on_sigint)
     try:
         mover.run()
     except KeyboardInterrupt:
+        interrupted = True
         print("\n\nInterrupted by user (Ctrl+C)")
     except Exception as e:
         print(f"\nError occurred: {e}")
     finally:
         mover._stop_alarm_thread()
+        mover._restore_timer_resolution()
+    return 130 if interrupted else None
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file